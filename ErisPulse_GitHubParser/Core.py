@@ -1,8 +1,9 @@
+import asyncio
 import re
 from typing import Any, Dict, Optional, Tuple
 
 from ErisPulse import i18n, sdk
-from ErisPulse.Core.Bases import BaseModule
+from ErisPulse.Core.Bases import BaseAdapter, BaseModule, SendDSL
 from ErisPulse.Core.Event import command, message
 
 from .GitHubClient import GitHubClient, GitHubError
@@ -10,7 +11,16 @@ from .I18n import register as _register_i18n
 from .TextTemplates import render_text
 from .Visualizer import Visualizer
 
-_GH_URL_FIND = re.compile(r'https?://(?:www\.)?github\.com/[A-Za-z0-9_.\-/]+')
+_GH_URL_FIND = re.compile(r'https?://(?:www\.)?github\.com/[A-Za-z0-9_.\-/]+', re.ASCII)
+_GH_URL_PREFIX = re.compile(r'https?://(?:www\.)?github\.com/', re.ASCII)
+_GH_OWNER_NAME = re.compile(r'[A-Za-z0-9_-]{1,39}', re.ASCII)
+_GH_REPO_NAME = re.compile(r'[A-Za-z0-9._-]{1,100}', re.ASCII)
+
+# SDK 的 Send 基类本身不代表能发图片：2.9 起基类 Image 委托给 Raw_ob12，2.5 则经
+# __getattr__ 打警告后报错。只看适配器自己的 Send 类是否实现了 Image，或在基类 Image
+# 可委托时实现了 Raw_ob12
+_BASE_SEND = (SendDSL, getattr(BaseAdapter, "Send", SendDSL), object)
+_IMAGE_SENDERS = ("Image", "Raw_ob12") if "Image" in vars(SendDSL) else ("Image",)
 
 _GH_RESERVED = {
     "settings", "orgs", "notifications", "search", "explore", "trending",
@@ -24,27 +34,30 @@ _GH_RESERVED = {
 
 def _parse_gh_url(url: str) -> Optional[Tuple[str, str, str, Any]]:
     url = url.split("#", 1)[0].split("?", 1)[0].rstrip(").,;]")
-    m = re.match(r'https?://(?:www\.)?github\.com/(.+)', url)
+    m = _GH_URL_PREFIX.match(url)
     if not m:
         return None
-    path = m.group(1).strip("/")
+    path = url[m.end():].strip("/")
     if not path:
         return None
     parts = path.split("/")
     owner = parts[0]
-    if owner.lower() in _GH_RESERVED:
+    if not _GH_OWNER_NAME.fullmatch(owner) or owner.lower() in _GH_RESERVED:
         return None
     if len(parts) == 1:
         return ("user", owner, "", "")
     repo = parts[1]
-    if not repo or repo.lower() in _GH_RESERVED:
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    if (not _GH_REPO_NAME.fullmatch(repo) or repo in (".", "..")
+            or repo.lower() in _GH_RESERVED):
         return None
     if len(parts) == 2:
         return ("repo", owner, repo, "")
     sub = parts[2].lower()
-    if sub == "issues" and len(parts) >= 4 and parts[3].isdigit():
+    if sub == "issues" and len(parts) >= 4 and parts[3].isascii() and parts[3].isdigit():
         return ("issue", owner, repo, int(parts[3]))
-    if sub in ("pull", "pulls") and len(parts) >= 4 and parts[3].isdigit():
+    if sub in ("pull", "pulls") and len(parts) >= 4 and parts[3].isascii() and parts[3].isdigit():
         return ("pr", owner, repo, int(parts[3]))
     if sub in ("commit", "commits"):
         return ("commits", owner, repo, "")
@@ -73,6 +86,7 @@ _DEFAULT_CONFIG: Dict[str, Any] = {
     "issue_comments_max": 3,
     "comment_max_len": 120,
     "cache_ttl": 600,
+    "cache_persist": True,
     "lang": "auto",
 }
 
@@ -84,6 +98,7 @@ class Main(BaseModule):
         self.config = self._load_config()
         self._client: Optional[GitHubClient] = None
         self._viz: Optional[Visualizer] = None
+        self._image_caps: Dict[str, bool] = {}
 
     @staticmethod
     def get_load_strategy():
@@ -125,9 +140,16 @@ class Main(BaseModule):
         self._client = GitHubClient(
             token=self.config.get("token", ""),
             cache_ttl=self.config.get("cache_ttl", 600),
+            persist=bool(self.config.get("cache_persist", True)),
         )
+        if self._client.persist:
+            restored = await self._client.restore_cache()
+            if restored:
+                self.logger.debug(f"已恢复 {restored} 条 GitHub 缓存")
+            self._client.start_persist()
         self.config["lang"] = self._resolve_lang()
         self._viz = Visualizer(self.sdk, self.config)
+        self._image_caps.clear()
         self._register_passive()
         self._register_commands()
         self._register_routes()
@@ -141,6 +163,8 @@ class Main(BaseModule):
 
     async def on_unload(self, event) -> bool:
         self._unregister_routes()
+        if self._client is not None and self._client.persist:
+            await self._client.stop_persist()
         self.logger.info(self._t("ghparser.unloaded", "GitHubParser unloaded"))
         return True
 
@@ -166,12 +190,25 @@ class Main(BaseModule):
                     seen.add(u)
                     uniq.append(u)
             max_n = max(1, min(5, int(self.config.get("auto_parse_max", 3))))
+            targets = []
             for url in uniq[:max_n]:
                 parsed = _parse_gh_url(url)
-                if not parsed:
-                    continue
+                if parsed:
+                    targets.append((url, parsed))
+            if not targets:
+                return
+            results = await asyncio.gather(
+                *(self._card_bytes(*parsed, image=self._can_image(event)) for _, parsed in targets),
+                return_exceptions=True,
+            )
+            for (url, parsed), res in zip(targets, results):
                 try:
-                    await self._dispatch(event, parsed, passive=True)
+                    if isinstance(res, GitHubError):
+                        await self._reply_error(event, parsed, res, passive=True)
+                    elif isinstance(res, BaseException):
+                        raise res
+                    else:
+                        await self._reply_card(event, parsed, *res)
                 except GitHubError as e:
                     self.logger.debug(f"被动解析失败 {url}: {e}")
                 except Exception as e:
@@ -257,34 +294,58 @@ class Main(BaseModule):
             theme=self.config.get("theme", "auto"),
         )
 
-    async def _card_bytes(self, kind, owner, repo, number):
+    def _can_image(self, event) -> bool:
+        platform = event.get_platform()
+        cap = self._image_caps.get(platform)
+        if cap is None:
+            inst = getattr(self.sdk.adapter, platform, None) if platform else None
+            if inst is None:
+                return True
+            cap = any(
+                name in vars(cls)
+                for cls in type(getattr(inst, "Send", None)).__mro__ if cls not in _BASE_SEND
+                for name in _IMAGE_SENDERS
+            )
+            self._image_caps[platform] = cap
+            if not cap:
+                self.logger.info(self._t("ghparser.image_unsupported", platform=platform))
+        return cap
+
+    async def _card_bytes(self, kind, owner, repo, number, image: bool = True):
         self.config["lang"] = self._resolve_lang()
         data = await self._fetch(kind, owner, repo, number)
+        image = image and self.config.get("image_enabled", True)
         avatar = None
-        if kind == "user" and self.config.get("avatar_enabled", True):
+        if image and kind == "user" and self.config.get("avatar_enabled", True):
             try:
                 avatar = await self._client.fetch_avatar_data_uri(data.get("avatar_url", ""))
             except Exception as e:
                 self.logger.debug(self._t("ghparser.avatar_fail", err=str(e)))
         png = None
-        if self.config.get("image_enabled", True):
+        if image:
             png = self._render_image(kind, owner, repo, data, avatar)
         return data, png
 
     async def _dispatch(self, event, parsed, passive: bool):
-        kind, owner, repo, number = parsed
         try:
-            data, png = await self._card_bytes(kind, owner, repo, number)
+            data, png = await self._card_bytes(*parsed, image=self._can_image(event))
         except GitHubError as e:
-            if passive:
-                if e.kind in ("rate_limit", "not_found", "auth", "network", "forbidden", "invalid"):
-                    await event.reply(self._error_msg(e))
-                else:
-                    self.logger.warning(f"被动解析失败 {kind} {owner}/{repo}/{number}: {e}")
-            else:
-                await event.reply(self._error_msg(e))
+            await self._reply_error(event, parsed, e, passive)
             return
+        await self._reply_card(event, parsed, data, png)
 
+    async def _reply_error(self, event, parsed, e: GitHubError, passive: bool):
+        kind, owner, repo, number = parsed
+        if passive:
+            if e.kind in ("rate_limit", "not_found", "auth", "network", "forbidden", "invalid"):
+                await event.reply(self._error_msg(e))
+            else:
+                self.logger.warning(f"被动解析失败 {kind} {owner}/{repo}/{number}: {e}")
+        else:
+            await event.reply(self._error_msg(e))
+
+    async def _reply_card(self, event, parsed, data, png):
+        kind, owner, repo, number = parsed
         if png is not None:
             try:
                 await event.reply(png, method="Image")
@@ -359,10 +420,8 @@ class Main(BaseModule):
             data = await c.get_user(owner)
         elif kind == "repo":
             data = await c.get_repo(owner, repo)
-        elif kind == "issue":
-            data = await c.get_issue(owner, repo, number)
-        elif kind == "pr":
-            data = await c.get_pr(owner, repo, number)
+        elif kind in ("issue", "pr"):
+            return await self._fetch_issue_pr(kind, owner, repo, number)
         elif kind == "commits":
             data = await c.get_commits(owner, repo, 5)
         elif kind == "langs":
@@ -371,13 +430,19 @@ class Main(BaseModule):
             data = await c.get_contributions(owner)
         else:
             raise GitHubError(f"未知类型: {kind}", kind="invalid")
-        if kind in ("issue", "pr") and self.config.get("issue_comments", True):
-            try:
-                data = dict(data)
-                data["comments_list"] = await c.get_issue_comments(
-                    owner, repo, number, self.config.get("issue_comments_max", 3))
-            except GitHubError as e:
-                self.logger.debug(f"评论获取失败 {owner}/{repo}#{number}: {e}")
+        return data
+
+    async def _fetch_issue_pr(self, kind, owner, repo, number):
+        c = self._client
+        getter = c.get_pr if kind == "pr" else c.get_issue
+        if not self.config.get("issue_comments", True):
+            return await getter(owner, repo, number)
+        data = dict(await getter(owner, repo, number))
+        try:
+            data["comments_list"] = await c.get_issue_comments(
+                owner, repo, number, self.config.get("issue_comments_max", 3))
+        except GitHubError as e:
+            self.logger.debug(f"评论获取失败 {owner}/{repo}#{number}: {e}")
         return data
 
     def _render_image(self, kind, owner, repo, data, avatar=None):
@@ -1,20 +1,39 @@
+import asyncio
 import base64
+import json
 import re
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 from ErisPulse import sdk
 
+from .State import state_kind
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 _GRAPHQL_URL = "https://api.github.com/graphql"
 _REST = "https://api.github.com"
 _CONTRIB_SVG_URL = "https://github.com/users/{user}/contributions"
 
-_RECT_RE = re.compile(r'<rect\b[^>]*data-date="([^"]+)"[^>]*?/?>')
+_CACHE_MAX = 512
+_MAX_CONCURRENCY = 8
+_PERSIST_KEY = "GitHubParser.cache"
+_PERSIST_INTERVAL = 60
+_PERSIST_SKIP = ("avatar:",)
+_NEGATIVE_TTL = 60
+
+_RECT_RE = re.compile(r'<rect\b[^>]*data-date="([^"]+)"[^>]*?/?>', re.ASCII)
 _ATTR_RE = {
-    "count": re.compile(r'data-count="(\d+)"'),
-    "level": re.compile(r'data-level="(\d+)"'),
+    "count": re.compile(r'data-count="(\d+)"', re.ASCII),
+    "level": re.compile(r'data-level="(\d+)"', re.ASCII),
 }
 
 
@@ -30,6 +49,29 @@ def _level_from_count(count: int) -> int:
     return 4
 
 
+@lru_cache(maxsize=4096)
+def _fmt_date(date_str: str) -> str:
+    if not date_str:
+        return "未知"
+    if len(date_str) == 20 and date_str[10] == "T" and date_str[19] == "Z":
+        return date_str[:10]
+    try:
+        dt = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
+        return dt.strftime("%Y-%m-%d")
+    except ValueError:
+        return date_str
+
+
+def _total(node: Dict[str, Any], field: str) -> int:
+    return int((node.get(field) or {}).get("totalCount", 0))
+
+
+def _nodes(conn: Any) -> List[Dict[str, Any]]:
+    if not isinstance(conn, dict):
+        return []
+    return [n for n in (conn.get("nodes") or []) if isinstance(n, dict)]
+
+
 def parse_contrib_svg(svg_text: str) -> Dict[str, Any]:
     days: List[Dict[str, Any]] = []
     for m in _RECT_RE.finditer(svg_text or ""):
@@ -58,13 +100,30 @@ class GitHubError(Exception):
 
 
 class GitHubClient:
-    def __init__(self, token: str = "", cache_ttl: int = 600):
+    def __init__(self, token: str = "", cache_ttl: int = 600, cache_max: int = _CACHE_MAX,
+                 max_concurrency: int = _MAX_CONCURRENCY, persist: bool = False):
         self.sdk = sdk
         self.logger = sdk.logger.get_child("GitHubParser.GitHub")
         self.client = sdk.client
         self.token = (token or "").strip()
         self.cache_ttl = max(30, int(cache_ttl))
-        self._cache: Dict[str, Tuple[Any, float]] = {}
+        self.cache_max = max(16, int(cache_max))
+        self._cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.persist = persist
+        self._persist_dirty = False
+        self._persist_failing = False
+        self._persist_task: Optional["asyncio.Task[None]"] = None
+        self._etags: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._request_sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._base_headers: Dict[str, str] = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "ErisPulse-GitHubParser",
+        }
+        if self.token:
+            self._base_headers["Authorization"] = f"Bearer {self.token}"
+        self._json_headers = self._headers({"Content-Type": "application/json"})
 
         if self.token:
             self.logger.info("GitHub token 已配置，匿名速率限制解除（5000/h）")
@@ -72,58 +131,194 @@ class GitHubClient:
             self.logger.warning("未配置 GitHub token，匿名访问速率受限（60/h），建议在配置中填写 token")
 
     def _headers(self, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
-        h = {"Accept": "application/vnd.github+json"}
-        if self.token:
-            h["Authorization"] = f"Bearer {self.token}"
-        if extra:
-            h.update(extra)
-        return h
+        if not extra:
+            return self._base_headers
+        return {**self._base_headers, **extra}
 
     def _get_cache(self, key: str) -> Optional[Any]:
         ent = self._cache.get(key)
         if ent is None:
             return None
-        data, ts = ent
-        if time.time() - ts < self.cache_ttl:
-            return data
-        self._cache.pop(key, None)
-        return None
+        data, expires = ent
+        if time.time() >= expires:
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        if isinstance(data, GitHubError):
+            raise GitHubError(str(data), status=data.status, kind=data.kind)
+        return data
 
-    def _set_cache(self, key: str, data: Any) -> Any:
-        self._cache[key] = (data, time.time())
-        if len(self._cache) > 256:
-            now = time.time()
-            for k in [k for k, (_, ts) in self._cache.items() if now - ts > self.cache_ttl]:
-                self._cache.pop(k, None)
+    def _set_cache(self, key: str, data: Any, ttl: Optional[float] = None) -> Any:
+        self._cache[key] = (data, time.time() + (self.cache_ttl if ttl is None else ttl))
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max:
+            self._cache.popitem(last=False)
+        if self.persist and not isinstance(data, GitHubError) and not key.startswith(_PERSIST_SKIP):
+            self._persist_dirty = True
         return data
 
+    async def restore_cache(self) -> int:
+        try:
+            saved = await self._storage("get", _PERSIST_KEY, {}) or {}
+        except Exception as e:
+            self.logger.warning(f"读取持久化缓存失败: {e}")
+            return 0
+        now = time.time()
+        restored = 0
+        for key, ent in saved.items() if isinstance(saved, dict) else ():
+            try:
+                data, expires = ent
+                expires = float(expires)
+            except (TypeError, ValueError):
+                continue
+            if expires > now and key not in self._cache:
+                self._cache[key] = (data, expires)
+                restored += 1
+        while len(self._cache) > self.cache_max:
+            self._cache.popitem(last=False)
+        return restored
+
+    def start_persist(self):
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.ensure_future(self._persist_loop())
+
+    async def stop_persist(self):
+        task, self._persist_task = self._persist_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.persist_cache()
+
+    async def _persist_loop(self):
+        while True:
+            await asyncio.sleep(_PERSIST_INTERVAL)
+            await self.persist_cache()
+
+    async def persist_cache(self):
+        if not self._persist_dirty:
+            return
+        self._persist_dirty = False
+        now = time.time()
+        entries = {
+            k: [data, expires] for k, (data, expires) in self._cache.items()
+            if expires > now and not isinstance(data, GitHubError) and not k.startswith(_PERSIST_SKIP)
+        }
+        try:
+            ok = await self._storage("set", _PERSIST_KEY, entries)
+            error = None if ok is not False else "存储返回失败"
+        except Exception as e:
+            error = e
+        if error is None:
+            self._persist_failing = False
+            return
+        self._persist_dirty = True
+        if not self._persist_failing:
+            self._persist_failing = True
+            self.logger.warning(f"写入持久化缓存失败，将在下次刷新时重试: {error}")
+
+    async def _storage(self, op: str, *args) -> Any:
+        env = self.sdk.env
+        if callable(getattr(type(env), f"a{op}", None)):
+            return await getattr(env, f"a{op}")(*args)
+        # 旧版 SDK 的存储只有同步 get/set，放到线程里执行以免阻塞事件循环
+        return await asyncio.to_thread(getattr(env, op), *args)
+
+    async def _shared(self, key: str, factory) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._drop_inflight(key, t))
+        return await asyncio.shield(task)
+
+    def _drop_inflight(self, key: str, task: "asyncio.Future[Any]"):
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+
     async def _get_json(self, url: str) -> Tuple[int, Any]:
+        return await self._shared(url, lambda: self._request_json(url))
+
+    async def _request_json(self, url: str) -> Tuple[int, Any]:
+        known = self._etags.get(url)
+        headers = self._headers({"If-None-Match": known[0]} if known else None)
         try:
-            resp = await self.client.get(url, headers=self._headers(), timeout=20)
+            async with self._request_sem:
+                resp = await self.client.get(url, headers=headers, timeout=20)
         except Exception as e:
             raise GitHubError(f"网络请求失败: {e}", kind="network") from None
         status = getattr(resp, "status", 0)
+        if status == 304 and known:
+            self._etags.move_to_end(url)
+            return 200, known[1]
         try:
-            data = await resp.json()
+            data = _loads(await resp.read())
         except Exception:
             data = None
+        etag = (getattr(resp, "headers", None) or {}).get("ETag")
+        if status == 200 and etag and data is not None:
+            self._etags[url] = (etag, data)
+            self._etags.move_to_end(url)
+            while len(self._etags) > self.cache_max:
+                self._etags.popitem(last=False)
         return status, data
 
     async def _post_json(self, url: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
         try:
-            resp = await self.client.post(
-                url, headers=self._headers({"Content-Type": "application/json"}),
-                json=payload, timeout=20,
-            )
+            async with self._request_sem:
+                resp = await self.client.post(
+                    url, headers=self._json_headers,
+                    json=payload, timeout=20,
+                )
         except Exception as e:
             raise GitHubError(f"网络请求失败: {e}", kind="network") from None
         status = getattr(resp, "status", 0)
         try:
-            data = await resp.json()
+            data = _loads(await resp.read())
         except Exception:
             data = None
         return status, data
 
+    async def _graphql(self, query: str, variables: Dict[str, Any], resource: str) -> Dict[str, Any]:
+        status, data = await self._post_json(_GRAPHQL_URL, {"query": query, "variables": variables})
+        if status == 401:
+            raise GitHubError("token 无效或已过期", status=401, kind="auth")
+        if status != 200 or not isinstance(data, dict):
+            self._check_common(status, data, resource)
+            raise GitHubError("GraphQL 响应格式异常", kind="error")
+        errors = data.get("errors")
+        if errors:
+            err = errors[0] if isinstance(errors[0], dict) else {}
+            if err.get("type") == "NOT_FOUND":
+                raise GitHubError(f"未找到 {resource}", status=404, kind="not_found")
+            raise GitHubError(f"GraphQL: {err.get('message', 'GraphQL 错误')}", kind="error")
+        return data.get("data") or {}
+
+    # 有 token 时卡片默认走 GraphQL，响应更窄，但没有 ETag：每次 TTL 到期刷新都消耗一个
+    # GraphQL 点数，而 REST 的 304 重新验证不计入限额。某张卡片一旦因 GraphQL 失败回退
+    # 到 REST 并拿到 ETag，就继续走 REST 复用免费的 304，直到该 ETag 被 LRU 淘汰。
+    async def _prefer_graphql(self, key: str, resource: str, rest_url: str, graphql, rest) -> Any:
+        if self.token and rest_url not in self._etags:
+            try:
+                return await graphql()
+            except GitHubError as e:
+                if e.kind == "not_found":
+                    self._set_cache(key, e, ttl=_NEGATIVE_TTL)
+                if e.kind in ("not_found", "invalid"):
+                    raise
+                self.logger.warning(f"GraphQL 获取 {resource} 失败，回退到 REST: {e}")
+        return await rest()
+
+    def _check(self, key: str, status: int, data: Any, resource: str):
+        try:
+            self._check_common(status, data, resource)
+        except GitHubError as e:
+            if e.kind == "not_found":
+                self._set_cache(key, e, ttl=_NEGATIVE_TTL)
+            raise
+
     def _check_common(self, status: int, data: Any, resource: str):
         if status == 200:
             return
@@ -156,7 +351,7 @@ class GitHubClient:
         if cached is not None:
             return cached
         status, data = await self._get_json(f"{_REST}/users/{username}")
-        self._check_common(status, data, f"用户 {username}")
+        self._check(key, status, data, f"用户 {username}")
         if not isinstance(data, dict):
             raise GitHubError("用户数据格式异常", kind="error")
         result = {
@@ -171,7 +366,7 @@ class GitHubClient:
             "following": data.get("following", 0),
             "public_repos": data.get("public_repos", 0),
             "public_gists": data.get("public_gists", 0),
-            "created_at": self._fmt_date(data.get("created_at", "")),
+            "created_at": _fmt_date(data.get("created_at", "")),
             "html_url": data.get("html_url", f"https://github.com/{username}"),
             "type": data.get("type", "User"),
         }
@@ -186,15 +381,25 @@ class GitHubClient:
         cached = self._get_cache(key)
         if cached is not None:
             return cached
-        status, data = await self._get_json(f"{_REST}/repos/{owner}/{repo}")
-        self._check_common(status, data, f"仓库 {owner}/{repo}")
+        url = f"{_REST}/repos/{owner}/{repo}"
+        result = await self._shared(key, lambda: self._prefer_graphql(
+            key, f"仓库 {owner}/{repo}", url,
+            lambda: self._repo_graphql(owner, repo),
+            lambda: self._repo_rest(key, url, owner, repo),
+        ))
+        return self._set_cache(key, result)
+
+    async def _repo_rest(self, key: str, url: str, owner: str, repo: str) -> Dict[str, Any]:
+        status, data = await self._get_json(url)
+        self._check(key, status, data, f"仓库 {owner}/{repo}")
         if not isinstance(data, dict):
             raise GitHubError("仓库数据格式异常", kind="error")
         lic = data.get("license") or {}
+        own = data.get("owner")
         result = {
             "full_name": data.get("full_name", f"{owner}/{repo}"),
             "name": data.get("name", repo),
-            "owner": data.get("owner", {}).get("login", owner) if isinstance(data.get("owner"), dict) else owner,
+            "owner": own.get("login", owner) if isinstance(own, dict) else owner,
             "description": data.get("description") or "暂无描述",
             "stars": data.get("stargazers_count", 0),
             "forks": data.get("forks_count", 0),
@@ -205,14 +410,57 @@ class GitHubClient:
             "homepage": data.get("homepage") or "",
             "topics": data.get("topics") or [],
             "default_branch": data.get("default_branch", "main"),
-            "created_at": self._fmt_date(data.get("created_at", "")),
-            "updated_at": self._fmt_date(data.get("updated_at", "")),
-            "pushed_at": self._fmt_date(data.get("pushed_at", "")),
+            "created_at": _fmt_date(data.get("created_at", "")),
+            "pushed_at": _fmt_date(data.get("pushed_at", "")),
             "html_url": data.get("html_url", f"https://github.com/{owner}/{repo}"),
             "archived": bool(data.get("archived")),
             "fork": bool(data.get("fork")),
         }
-        return self._set_cache(key, result)
+        return result
+
+    async def _repo_graphql(self, owner: str, repo: str) -> Dict[str, Any]:
+        query = """
+        query($owner: String!, $name: String!) {
+          repository(owner: $owner, name: $name) {
+            nameWithOwner name owner { login } description url homepageUrl
+            stargazerCount forkCount isArchived isFork createdAt pushedAt
+            watchers { totalCount }
+            issues(states: OPEN) { totalCount }
+            pullRequests(states: OPEN) { totalCount }
+            primaryLanguage { name }
+            licenseInfo { name }
+            defaultBranchRef { name }
+            repositoryTopics(first: 20) { nodes { topic { name } } }
+          }
+        }
+        """
+        resource = f"仓库 {owner}/{repo}"
+        data = await self._graphql(query, {"owner": owner, "name": repo}, resource)
+        node = data.get("repository")
+        if not isinstance(node, dict):
+            raise GitHubError(f"未找到 {resource}", status=404, kind="not_found")
+        lic = node.get("licenseInfo") or {}
+        lang = node.get("primaryLanguage") or {}
+        return {
+            "full_name": node.get("nameWithOwner") or f"{owner}/{repo}",
+            "name": node.get("name") or repo,
+            "owner": (node.get("owner") or {}).get("login", owner),
+            "description": node.get("description") or "暂无描述",
+            "stars": node.get("stargazerCount", 0),
+            "forks": node.get("forkCount", 0),
+            "watchers": _total(node, "watchers"),
+            "open_issues": _total(node, "issues") + _total(node, "pullRequests"),
+            "language": lang.get("name") or "未指定",
+            "license": lic.get("name") or "无",
+            "homepage": node.get("homepageUrl") or "",
+            "topics": [(t.get("topic") or {}).get("name", "") for t in _nodes(node.get("repositoryTopics"))],
+            "default_branch": (node.get("defaultBranchRef") or {}).get("name", "main"),
+            "created_at": _fmt_date(node.get("createdAt") or ""),
+            "pushed_at": _fmt_date(node.get("pushedAt") or ""),
+            "html_url": node.get("url") or f"https://github.com/{owner}/{repo}",
+            "archived": bool(node.get("isArchived")),
+            "fork": bool(node.get("isFork")),
+        }
 
     async def get_commits(self, owner: str, repo: str, limit: int = 5) -> List[Dict[str, Any]]:
         owner = (owner or "").strip().lstrip("@")
@@ -225,7 +473,7 @@ class GitHubClient:
         status, data = await self._get_json(
             f"{_REST}/repos/{owner}/{repo}/commits?per_page={limit}"
         )
-        self._check_common(status, data, f"{owner}/{repo} 的提交")
+        self._check(key, status, data, f"{owner}/{repo} 的提交")
         if not isinstance(data, list):
             return []
         out: List[Dict[str, Any]] = []
@@ -238,7 +486,7 @@ class GitHubClient:
                 "sha": (item.get("sha") or "")[:7],
                 "message": self._first_line(commit.get("message") or ""),
                 "author": author.get("name") or (item.get("author") or {}).get("login") or "未知",
-                "date": self._fmt_date(author.get("date") or ""),
+                "date": _fmt_date(author.get("date") or ""),
                 "html_url": item.get("html_url", ""),
             })
         return self._set_cache(key, out)
@@ -263,23 +511,38 @@ class GitHubClient:
         if cached is not None:
             return cached
         endpoint = "pulls" if kind == "pr" else "issues"
-        status, data = await self._get_json(f"{_REST}/repos/{owner}/{repo}/{endpoint}/{number}")
-        self._check_common(status, data, f"{owner}/{repo} #{number}")
+        url = f"{_REST}/repos/{owner}/{repo}/{endpoint}/{number}"
+        result = await self._shared(key, lambda: self._prefer_graphql(
+            key, f"{owner}/{repo} #{number}", url,
+            lambda: self._issue_pr_graphql(kind, owner, repo, number),
+            lambda: self._issue_pr_rest(key, url, kind, owner, repo, number),
+        ))
+        return self._set_cache(key, result)
+
+    async def _issue_pr_rest(self, key: str, url: str, kind: str, owner: str, repo: str,
+                             number: int) -> Dict[str, Any]:
+        status, data = await self._get_json(url)
+        self._check(key, status, data, f"{owner}/{repo} #{number}")
         if not isinstance(data, dict):
             raise GitHubError("数据格式异常", kind="error")
+        user = data.get("user")
+        closed_at = data.get("closed_at")
+        pull = data.get("pull_request")
+        merged_at = data.get("merged_at") or (pull.get("merged_at") if isinstance(pull, dict) else None)
         result = {
             "number": data.get("number", number),
             "title": data.get("title") or "(无标题)",
             "state": data.get("state", "open"),
-            "user": (data.get("user") or {}).get("login", "未知") if isinstance(data.get("user"), dict) else "未知",
+            "user": user.get("login", "未知") if isinstance(user, dict) else "未知",
             "comments": data.get("comments", 0),
-            "created_at": self._fmt_date(data.get("created_at", "")),
-            "closed_at": self._fmt_date(data.get("closed_at", "")) if data.get("closed_at") else "—",
+            "created_at": _fmt_date(data.get("created_at", "")),
+            "closed_at": _fmt_date(closed_at) if closed_at and not merged_at else "—",
             "html_url": data.get("html_url", ""),
             "assignees": [a.get("login", "") for a in (data.get("assignees") or []) if isinstance(a, dict)],
             "labels": [l.get("name", "") for l in (data.get("labels") or []) if isinstance(l, dict)],
-            "merged_at": self._fmt_date(data.get("merged_at", "")) if data.get("merged_at") else "",
+            "merged_at": _fmt_date(merged_at) if merged_at else "",
         }
+        result["state_kind"] = state_kind(result)
         if kind == "pr":
             result.update({
                 "commits": data.get("commits", 0),
@@ -288,7 +551,62 @@ class GitHubClient:
                 "changed_files": data.get("changed_files", 0),
                 "draft": bool(data.get("draft")),
             })
-        return self._set_cache(key, result)
+        return result
+
+    async def _issue_pr_graphql(self, kind: str, owner: str, repo: str, number: int) -> Dict[str, Any]:
+        query = """
+        query($owner: String!, $name: String!, $number: Int!) {
+          repository(owner: $owner, name: $name) {
+            issueOrPullRequest(number: $number) {
+              __typename
+              ... on Issue {
+                number title state url createdAt closedAt author { login }
+                comments { totalCount }
+                assignees(first: 10) { nodes { login } }
+                labels(first: 20) { nodes { name } }
+              }
+              ... on PullRequest {
+                number title state url createdAt closedAt mergedAt author { login }
+                comments { totalCount }
+                assignees(first: 10) { nodes { login } }
+                labels(first: 20) { nodes { name } }
+                commits { totalCount }
+                additions deletions changedFiles isDraft
+              }
+            }
+          }
+        }
+        """
+        resource = f"{owner}/{repo} #{number}"
+        data = await self._graphql(query, {"owner": owner, "name": repo, "number": number}, resource)
+        node = (data.get("repository") or {}).get("issueOrPullRequest")
+        if not isinstance(node, dict) or (kind == "pr" and node.get("__typename") != "PullRequest"):
+            raise GitHubError(f"未找到 {resource}", status=404, kind="not_found")
+        closed_at = node.get("closedAt")
+        merged_at = node.get("mergedAt")
+        result = {
+            "number": node.get("number", number),
+            "title": node.get("title") or "(无标题)",
+            "state": "open" if node.get("state", "OPEN") == "OPEN" else "closed",
+            "user": (node.get("author") or {}).get("login", "未知"),
+            "comments": _total(node, "comments"),
+            "created_at": _fmt_date(node.get("createdAt") or ""),
+            "closed_at": _fmt_date(closed_at) if closed_at and not merged_at else "—",
+            "html_url": node.get("url", ""),
+            "assignees": [a.get("login", "") for a in _nodes(node.get("assignees"))],
+            "labels": [l.get("name", "") for l in _nodes(node.get("labels"))],
+            "merged_at": _fmt_date(merged_at) if merged_at else "",
+        }
+        result["state_kind"] = state_kind(result)
+        if kind == "pr":
+            result.update({
+                "commits": _total(node, "commits"),
+                "additions": node.get("additions", 0),
+                "deletions": node.get("deletions", 0),
+                "changed_files": node.get("changedFiles", 0),
+                "draft": bool(node.get("isDraft")),
+            })
+        return result
 
     async def get_issue_comments(self, owner: str, repo: str, number, limit: int = 3) -> List[Dict[str, Any]]:
         owner = (owner or "").strip().lstrip("@")
@@ -305,7 +623,7 @@ class GitHubClient:
         status, data = await self._get_json(
             f"{_REST}/repos/{owner}/{repo}/issues/{number}/comments?per_page={limit}"
         )
-        self._check_common(status, data, f"{owner}/{repo} #{number} 评论")
+        self._check(key, status, data, f"{owner}/{repo} #{number} 评论")
         if not isinstance(data, list):
             return []
         out: List[Dict[str, Any]] = []
@@ -318,7 +636,7 @@ class GitHubClient:
             out.append({
                 "user": (c.get("user") or {}).get("login", "未知") if isinstance(c.get("user"), dict) else "未知",
                 "body": body,
-                "created_at": self._fmt_date(c.get("created_at") or ""),
+                "created_at": _fmt_date(c.get("created_at") or ""),
             })
         return self._set_cache(key, out)
 
@@ -332,7 +650,7 @@ class GitHubClient:
         if cached is not None:
             return cached
         status, data = await self._get_json(f"{_REST}/repos/{owner}/{repo}/languages")
-        self._check_common(status, data, f"{owner}/{repo} 语言")
+        self._check(key, status, data, f"{owner}/{repo} 语言")
         if not isinstance(data, dict) or not data:
             raise GitHubError("无语言数据", kind="not_found")
         cleaned = {str(k): int(v) for k, v in data.items() if isinstance(v, (int, float))}
@@ -375,18 +693,8 @@ class GitHubClient:
           }
         }
         """
-        status, data = await self._post_json(
-            _GRAPHQL_URL, {"query": query, "variables": {"login": username}}
-        )
-        if status == 401:
-            raise GitHubError("token 无效或已过期", status=401, kind="auth")
-        if status != 200 or not isinstance(data, dict):
-            self._check_common(status, data, f"用户 {username} 的贡献")
-        errors = data.get("errors") if isinstance(data, dict) else None
-        if errors:
-            msg = errors[0].get("message", "GraphQL 错误") if errors else "GraphQL 错误"
-            raise GitHubError(f"GraphQL: {msg}", kind="error")
-        cal = (((data.get("data") or {}).get("user") or {})
+        data = await self._graphql(query, {"login": username}, f"用户 {username} 的贡献")
+        cal = ((data.get("user") or {})
                .get("contributionsCollection") or {}).get("contributionCalendar") or {}
         total = int(cal.get("totalContributions", 0))
         weeks_raw = cal.get("weeks") or []
@@ -408,10 +716,11 @@ class GitHubClient:
 
     async def _contrib_scrape(self, username: str) -> Dict[str, Any]:
         try:
-            resp = await self.client.get(
-                _CONTRIB_SVG_URL.format(user=username),
-                headers={"Accept": "image/svg+xml"}, timeout=20,
-            )
+            async with self._request_sem:
+                resp = await self.client.get(
+                    _CONTRIB_SVG_URL.format(user=username),
+                    headers={"Accept": "image/svg+xml"}, timeout=20,
+                )
         except Exception as e:
             raise GitHubError(f"获取贡献页失败: {e}", kind="network") from None
         status = getattr(resp, "status", 0)
@@ -443,7 +752,8 @@ class GitHubClient:
         if cached is not None:
             return cached
         try:
-            resp = await self.client.get(avatar_url, headers={"Accept": "image/*"}, timeout=15)
+            async with self._request_sem:
+                resp = await self.client.get(avatar_url, headers={"Accept": "image/*"}, timeout=15)
         except Exception as e:
             self.logger.warning(f"获取头像失败: {e}")
             return None
@@ -478,13 +788,3 @@ class GitHubClient:
     def _first_line(text: str) -> str:
         text = (text or "").strip()
         return text.split("\n", 1)[0].strip() if text else "(无提交信息)"
-
-    @staticmethod
-    def _fmt_date(date_str: str) -> str:
-        if not date_str:
-            return "未知"
-        try:
-            dt = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-            return dt.strftime("%Y-%m-%d")
-        except ValueError:
-            return date_str
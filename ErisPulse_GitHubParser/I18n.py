@@ -39,6 +39,7 @@ UI: Dict[str, Dict[str, str]] = {
         "ghparser.err_network": "网络错误: {msg}",
         "ghparser.err_default": "出错: {msg}",
         "ghparser.send_fail_log": "图片发送失败，降级文本: {err}",
+        "ghparser.image_unsupported": "平台 {platform} 不支持图片发送，将直接使用文本",
         "ghparser.avatar_fail": "头像获取失败: {err}",
         "ghparser.render_fail": "渲染图片失败({kind}): {err}",
         "ghparser.passive_skip": "被动解析已关闭（auto_parse=false）",
@@ -86,6 +87,7 @@ UI: Dict[str, Dict[str, str]] = {
         "ghparser.err_network": "Network error: {msg}",
         "ghparser.err_default": "Error: {msg}",
         "ghparser.send_fail_log": "Image send failed, fallback to text: {err}",
+        "ghparser.image_unsupported": "Platform {platform} cannot send images, using text",
         "ghparser.avatar_fail": "Avatar fetch failed: {err}",
         "ghparser.render_fail": "Render failed ({kind}): {err}",
         "ghparser.passive_skip": "Passive parsing off (auto_parse=false)",
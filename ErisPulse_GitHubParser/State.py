@@ -0,0 +1,13 @@
+from typing import Any, Dict
+
+_KINDS = ("open", "closed", "merged")
+
+
+# 客户端结果自带 state_kind；旧版持久化缓存里没有时按 merged_at / state 推导
+def state_kind(data: Dict[str, Any]) -> str:
+    kind = data.get("state_kind")
+    if kind in _KINDS:
+        return kind
+    if data.get("merged_at"):
+        return "merged"
+    return "open" if data.get("state") == "open" else "closed"
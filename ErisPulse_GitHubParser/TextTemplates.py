@@ -1,6 +1,10 @@
 from typing import Any, Dict, List
 
 from .I18n import card_labels
+from .State import state_kind
+
+
+_STATE_LABELS = {"open": "state_open", "closed": "state_closed", "merged": "state_merged"}
 
 
 def _fc(n) -> str:
@@ -85,12 +89,7 @@ def _repo(d: Dict[str, Any], L) -> str:
 
 def _issue_pr(kind: str, owner: str, repo: str, d: Dict[str, Any], L) -> str:
     tag = L["pr_label"] if kind == "pr" else L["issue_label"]
-    if d.get("merged_at"):
-        state = L["state_merged"]
-    elif d.get("state") == "open":
-        state = L["state_open"]
-    else:
-        state = L["state_closed"]
+    state = L[_STATE_LABELS[state_kind(d)]]
     lines = [f"{owner}/{repo} #{d.get('number', '?')} [{state}] {d.get('title', '')}"]
     body = f"{L['author']}: {d.get('user', '')} · {L['comments']}: {_fc(d.get('comments', 0))}"
     if kind == "pr":
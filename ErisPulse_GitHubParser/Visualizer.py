@@ -3,6 +3,7 @@ import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from .I18n import card_labels
+from .State import state_kind
 
 
 def _fmt_count(n: int) -> str:
@@ -56,6 +57,13 @@ LANG_COLORS = {
 }
 
 
+_STATE_PILLS = {
+    "open": ("issue", "state_open"),
+    "closed": ("issue", "state_closed"),
+    "merged": ("pr", "state_merged"),
+}
+
+
 def _lang_color(lang: str) -> str:
     return LANG_COLORS.get(lang) or _LANG_FALLBACK_PALETTE[
         abs(hash(lang)) % len(_LANG_FALLBACK_PALETTE)
@@ -254,12 +262,11 @@ class Visualizer:
         return (self._PAGE_PAD * 2 + n * self._CARD_PAD * 2
                 + sum(inner_heights) + max(0, n - 1) * self._CARD_GAP + footer + 24)
 
-    def _state_pill(self, state: str, merged: bool = False) -> str:
-        if merged:
-            return f"<span class='state-pill merged'>{_icon('pr', 'currentColor', 13)}{self._L('state_merged')}</span>"
-        if state == "open":
-            return f"<span class='state-pill open'>{_icon('issue', 'currentColor', 13)}{self._L('state_open')}</span>"
-        return f"<span class='state-pill closed'>{_icon('issue', 'currentColor', 13)}{self._L('state_closed')}</span>"
+    def _state_pill(self, state_kind: str) -> str:
+        if state_kind not in _STATE_PILLS:
+            state_kind = "closed"
+        icon, label = _STATE_PILLS[state_kind]
+        return f"<span class='state-pill {state_kind}'>{_icon(icon, 'currentColor', 13)}{self._L(label)}</span>"
 
     def _build_user(self, data: Dict[str, Any], avatar_uri: Optional[str] = None) -> Tuple[str, int, int]:
         login = data.get("login", "")
@@ -404,11 +411,10 @@ class Visualizer:
     def _build_issue_pr(self, kind: str, owner_repo: str, data: Dict[str, Any]) -> Tuple[str, int, int]:
         number = data.get("number", "?")
         title = data.get("title", "")
-        state = data.get("state", "open")
-        merged = bool(data.get("merged_at"))
+        kind_key = state_kind(data)
         label = self._L('pr_label') if kind == "pr" else self._L('issue_label')
 
-        pill = self._state_pill(state, merged)
+        pill = self._state_pill(kind_key)
         chips_parts = [
             f"<div class='chip'>{_icon('eye', self.BLUE)}<b>{_fmt_count(data.get('comments', 0))}</b>{self._L('comments')}</div>",
         ]
@@ -424,9 +430,9 @@ class Visualizer:
         if data.get("assignees"):
             kv_rows.append((self._L('assignees'), self._esc("、".join(data["assignees"][:5]))))
         kv_rows.append((self._L('created'), self._esc(data.get("created_at", self._L('unknown')))))
-        if merged:
+        if kind_key == "merged":
             kv_rows.append((self._L('merged_at'), self._esc(data.get("merged_at"))))
-        elif state == "closed":
+        elif kind_key == "closed":
             kv_rows.append((self._L('closed_at'), self._esc(data.get("closed_at", "—"))))
         kv_html = "<div class='kv'>" + "".join(
             f"<div class='kv-row'><div class='k'>{k}</div><div class='v'>{v}</div></div>"